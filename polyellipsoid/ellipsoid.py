@@ -5,25 +5,28 @@ class Ellipsoid(Compound):
     def __init__(self, mass, length):
         super(Ellipsoid, self).__init__(name="ellipsoid")
         self.length = float(length)
+        half_length = self.length / 2
+        quarter_length = self.length / 4
+        particle_mass = mass / 4
         # Create the constituent particles
         self.head = Compound(
-                pos=[self.length/2, 0, 0],
+                pos=[half_length, 0, 0],
                 name="A",
-                mass=mass/4
+                mass=particle_mass
         )
         self.tail = Compound(
-                pos=[-self.length/2, 0, 0],
+                pos=[-half_length, 0, 0],
                 name="A",
-                mass=mass/4
+                mass=particle_mass
         )
         self.head_mid = Compound(
-                pos=[self.length/4, 0, 0],
+                pos=[quarter_length, 0, 0],
                 name="B",
-                mass=mass/4
+                mass=particle_mass
         )
         self.tail_mid = Compound(
-                pos=[-self.length/4, 0, 0],
+                pos=[-quarter_length, 0, 0],
                 name="B",
-                mass=mass/4
+                mass=particle_mass
         )
         self.add([self.head, self.tail, self.head_mid, self.tail_mid])
@@ -1,7 +1,7 @@
+from itertools import combinations_with_replacement
+
 from cmeutils.geometry import moit
 from cmeutils.gsd_utils import create_rigid_snapshot, update_rigid_snapshot
-from gmso.external.convert_mbuild import from_mbuild
-from gmso.external.convert_parmed import to_parmed
 from mbuild.formats.hoomd_forcefield import to_hoomdsnapshot
 
 import hoomd
@@ -69,20 +69,13 @@ class Simulation:
         self._dt = dt
         # Snapshot with rigid center placeholders, no toplogy information
         init_snap = create_rigid_snapshot(system.mb_system)
-        # Use GMSO to populate angle information before making snapshot
-        gmso_system = from_mbuild(system.mb_system)
-        gmso_system.identify_connections()
-        parmed_system = to_parmed(gmso_system)
-        # Atom types need to be set for angles to be correctly added
-        for atom in parmed_system.atoms:
-            atom.type = atom.name
         # Snapsot with complete toplogy information added
-        self._snapshot, refs = to_hoomdsnapshot(
-                parmed_system, hoomd_snapshot=init_snap
+        snapshot, refs = to_hoomdsnapshot(
+                system.to_parmed(), hoomd_snapshot=init_snap
         )
         # Snapshot with info updated for rigid centers, used by Hoomd
         self.snapshot, self.rigid = update_rigid_snapshot(
-                snapshot=self._snapshot, mb_compound=system.mb_system
+                snapshot=snapshot, mb_compound=system.mb_system
         )
         self.gsd_write = gsd_write
         self.log_write = log_write
@@ -103,9 +96,11 @@ class Simulation:
         nl = hoomd.md.nlist.Cell(buffer=0.40)
         gb = hoomd.md.pair.aniso.GayBerne(nlist=nl, default_r_cut=r_cut)
         gb.params[('R', 'R')] = dict(epsilon=epsilon, lperp=lperp, lpar=lpar)
-        zero_pairs = [('A','A'), ('B','B'), ('A','B'), ('A','R'), ('B','R')]
-        for pair in zero_pairs:
-            gb.params[pair] = dict(epsilon=0.0, lperp=0.0, lpar=0.0)
+        # Only the rigid centers interact; every other pair is zeroed out
+        zero_params = dict(epsilon=0.0, lperp=0.0, lpar=0.0)
+        for pair in combinations_with_replacement(("A", "B", "R"), 2):
+            if pair != ("R", "R"):
+                gb.params[pair] = zero_params
         self.forcefield.append(gb)
 
         harmonic_bond = hoomd.md.bond.Harmonic()
@@ -1,13 +1,20 @@
+import math
+
 from polyellipsoid import Ellipsoid
 from polyellipsoid.utils import base_units
 
+from gmso.external.convert_mbuild import from_mbuild
+from gmso.external.convert_parmed import to_parmed
 import hoomd
 import mbuild as mb
 from mbuild.formats.hoomd_forcefield import to_hoomdsnapshot
 from mbuild.lib.recipes.polymer import Polymer
 import numpy as np
+import parmed as pmd
 
 units = base_units.base_units()
+_CM_TO_NM = units["cm_to_nm"]
+_AMU_TO_G = units["amu_to_g"]
 
 
 class System:
@@ -50,6 +57,9 @@ class System:
         density.
     stack : System initialization method that populates chains on a lattice
         Can be used to create ordered initial configurations
+    to_parmed : Returns the system as a new parmed Structure
+        The topology (including angle identification) is cached while
+        the particles and bonds of mb_system are unchanged.
 
     """
     def __init__(
@@ -79,13 +89,16 @@ class System:
         self.system_mass = bead_mass * self.n_beads
         self.target_box = None
         self.mb_system = None
+        self._parmed_topology = None
         
         self.chains = []
+        # Every bead is identical, so one Ellipsoid serves as the monomer
+        # for all chains, and chains of equal length are cloned from a
+        # single built template rather than rebuilt from scratch.
+        ellipsoid = Ellipsoid(mass=self.bead_mass, length=self.bead_length)
+        templates = {}
         for n, l in zip(n_chains, chain_lengths):
-            for i in range(n):
-                ellipsoid = Ellipsoid(
-                        mass=self.bead_mass, length=self.bead_length
-                )
+            if l not in templates:
                 chain = Polymer()
                 chain.add_monomer(
                         ellipsoid,
@@ -95,13 +108,9 @@ class System:
                         separation=self.bond_length
                 )
                 chain.build(n=l, add_hydrogens=False)
-                chain.freud_generate_bonds(
-                        name_a="B",
-                        name_b="B",
-                        dmin=self.bead_length / 2 - 0.1, 
-                        dmax=self.bead_length / 2 + bond_length + 0.1 
-                )
-                self.chains.append(chain)
+                _add_bonds(chain, name="B")
+                templates[l] = chain
+            self.chains.extend([mb.clone(templates[l]) for i in range(n)])
 
     def pack(self, box_expand_factor=5):
         """Uses mBuild's fill_box function to fill a cubic box
@@ -122,8 +131,8 @@ class System:
         pack_box = self.target_box * box_expand_factor
         self.mb_system = mb.packing.fill_box(
             compound=self.chains,
-            n_compounds=[1 for i in self.chains],
-            box=list(pack_box),
+            n_compounds=[1] * len(self.chains),
+            box=pack_box.tolist(),
             overlap=0.5,
             edge=0.5,
             fix_orientation=True
@@ -141,24 +150,21 @@ class System:
                     "The number of molecules in the system should equal "
                     f"2*n*n. You have {sum(self.n_chains)} number of chains."
             )
-        next_idx = 0
-        self.mb_system = mb.Compound()
-        for i in range(n):
-            layer = mb.Compound()
-            for j in range(n): # Add chains to the layer along the y dir
-                try:
-                    chain1 = self.chains[next_idx]
-                    chain2 = self.chains[next_idx + 1]
-                    translate_by = np.array(vector)*(0, y, z)
-                    chain2.translate(translate_by)
-                    cell = mb.Compound(subcompounds=[chain1, chain2])
-                    cell.translate((0, y*j, 0))
-                    layer.add(cell)
-                    next_idx += 2
-                except IndexError:
-                    pass
-            layer.translate((0, 0, z*1)) # shift layers along x dir
-            self.mb_system.add(layer)
+        # Offset of every chain in the lattice, two chains per unit cell.
+        # Each chain is translated once by its full offset.
+        cell_idx = np.repeat(np.tile(np.arange(n), n), 2)
+        offsets = np.zeros((2*n*n, 3))
+        layer_idx = np.repeat(np.arange(n), 2*n)
+        offsets[:, 1] = y * cell_idx # Add chains to the layer along the y dir
+        offsets[:, 2] = z * (layer_idx + 1) # shift layers along the z dir
+        offsets[1::2] += np.array(vector) * (0, y, z)
+        # Place copies so self.chains stays untranslated and unparented,
+        # and stack() or pack() can be called again on the same system
+        chains = [mb.clone(chain) for chain in self.chains]
+        for chain, offset in zip(chains, offsets):
+            chain.translate(offset)
+        # Build the system in one step instead of nesting cells and layers
+        self.mb_system = mb.Compound(subcompounds=chains)
 
         bounding_box = np.array(self.mb_system.get_boundingbox().lengths)
         bounding_box *= 3 
@@ -174,6 +180,51 @@ class System:
         )
         self.mb_system.label_rigid_bodies(discrete_bodies="ellipsoid")
 
+    def to_parmed(self):
+        """Converts mb_system into a parmed Structure with angles identified.
+
+        The topology (bonds, angles and atom types) is cached and only
+        rebuilt when the particles or bonds of mb_system change, so
+        re-packing or re-stacking the same chains reuses it. Each call
+        returns a new Structure with the current coordinates and box.
+
+        """
+        if self.mb_system is None:
+            raise ValueError(
+                    "The system has not been initialized yet. "
+                    "Call pack() or stack() before to_parmed()."
+            )
+        index = {p: i for i, p in enumerate(self.mb_system.particles())}
+        topology = (
+                tuple(p.name for p in index),
+                frozenset(
+                    frozenset((index[a], index[b]))
+                    for a, b in self.mb_system.bonds()
+                )
+        )
+        if self._parmed_topology is None or (
+                self._parmed_topology[0] != topology
+        ):
+            # Use GMSO to populate angle information
+            gmso_system = from_mbuild(self.mb_system)
+            gmso_system.identify_connections()
+            template = to_parmed(gmso_system)
+            # Atom types need to be set for angles to be correctly added
+            for atom in template.atoms:
+                atom.type = atom.name
+            self._parmed_topology = (topology, template)
+
+        structure = self._parmed_topology[1].copy(pmd.Structure)
+        # mBuild uses nm, parmed uses Angstrom
+        structure.coordinates = self.mb_system.xyz * 10
+        box = self.mb_system.box
+        if box is None:
+            box = self.mb_system.get_boundingbox()
+        structure.box = np.concatenate(
+                (np.array(box.lengths) * 10, np.array(box.angles))
+        )
+        return structure
+
     def set_target_box(
             self,
             x_constraint=None,
@@ -196,18 +247,23 @@ class System:
             Fixes the box length along the z axis
 
         """
-        if not any([x_constraint, y_constraint, z_constraint]):
-            Lx = Ly = Lz = self._calculate_L()
+        constraints = [x_constraint, y_constraint, z_constraint]
+        is_fixed = [c is not None for c in constraints]
+        if not any(is_fixed):
+            L = self._calculate_L()
+            self.target_box = np.array([L, L, L])
         else:
-            constraints = np.array([x_constraint, y_constraint, z_constraint])
-            fixed_L = constraints[np.where(constraints!=None)]
             #Conv from nm to cm for _calculate_L
-            fixed_L /= units["cm_to_nm"]
+            fixed_L = tuple(
+                    c / _CM_TO_NM
+                    for c, fixed in zip(constraints, is_fixed) if fixed
+            )
             L = self._calculate_L(fixed_L = fixed_L)
-            constraints[np.where(constraints==None)] = L
-            Lx, Ly, Lz = constraints
-
-        self.target_box = np.array([Lx, Ly, Lz])
+            box = [
+                    c if fixed else L
+                    for c, fixed in zip(constraints, is_fixed)
+            ]
+            self.target_box = np.array(box, dtype=float)
 
     def _calculate_L(self, fixed_L=None):
         """Calculates the required box length(s) given the
@@ -220,18 +276,52 @@ class System:
 
         Parameters
         ----------
-        fixed_L : np.array, optional, defualt=None
-            Array of fixed box lengths to be accounted for
+        fixed_L : tuple of float, optional, defualt=None
+            Fixed box lengths (cm) to be accounted for
             when solving for L
 
         """
-        M = self.system_mass * units["amu_to_g"]  # grams
+        M = self.system_mass * _AMU_TO_G  # grams
         vol = (M / self.density) # cm^3
         if fixed_L is None:
             L = vol**(1/3)
+        elif len(fixed_L) == 1: # vol / L is cm^2
+            L = math.sqrt(vol / fixed_L[0])
         else:
-            L = vol / np.prod(fixed_L)
-            if len(fixed_L) == 1: # L is cm^2
-                L = L**(1/2)
-        L *= units["cm_to_nm"]  # convert cm to nm
+            L = vol / (fixed_L[0] * fixed_L[1])
+        L *= _CM_TO_NM  # convert cm to nm
         return L
+
+
+def _add_bonds(compound, name):
+    """Adds bonds between particles of the same name along a linear chain.
+
+    Each bead contributes two particles of the given name, and these are
+    always bonded to each other. Neighboring beads are joined head to tail,
+    so the same pair of particles is bonded across every junction; which
+    pair that is gets decided once from the first two beads.
+
+    Parameters
+    ----------
+    compound : mbuild.Compound, required
+        The chain to add bonds to
+    name : str, required
+        Name of the particles to bond together
+
+    """
+    particles = [p for p in compound.particles() if p.name == name]
+    heads = particles[0::2]
+    tails = particles[1::2]
+    for head, tail in zip(heads, tails):
+        compound.add_bond((head, tail))
+    if len(heads) < 2:
+        return
+    if (
+            np.linalg.norm(tails[0].pos - heads[1].pos)
+            < np.linalg.norm(heads[0].pos - tails[1].pos)
+    ):
+        junctions = zip(tails[:-1], heads[1:])
+    else:
+        junctions = zip(heads[:-1], tails[1:])
+    for pair in junctions:
+        compound.add_bond(pair)
@@ -62,6 +62,38 @@ class TestSimulate(BaseTest):
         for i in range(0, num_rigid):
             assert sim.snapshot.particles.types[ids[i]] == "R"
     
+    def test_moved_system(self, packed_system):
+        sim1 = Simulation(
+                system=packed_system,
+                lperp=1.0,
+                lpar=1.0,
+                epsilon=1.0,
+                dt=0.001,
+                r_cut=2.0,
+                bond_k=1000,
+                seed=42,
+                gsd_write=1000,
+                log_write=100
+        )
+        pos1 = np.copy(sim1.snapshot.particles.position)
+        shift = np.array([0.05, 0, 0])
+        packed_system.mb_system.translate(shift)
+        sim2 = Simulation(
+                system=packed_system,
+                lperp=1.0,
+                lpar=1.0,
+                epsilon=1.0,
+                dt=0.001,
+                r_cut=2.0,
+                bond_k=1000,
+                seed=42,
+                gsd_write=1000,
+                log_write=100
+        )
+        pos2 = sim2.snapshot.particles.position
+        # Rigid centers and constituent particles both move (nm to Angstrom)
+        assert np.allclose(pos2 - pos1, shift * 10, atol=1e-3)
+
     def test_shrink(self, sim_init):
         sim_init.run_shrink(n_steps=2000, kT=1.0, tau_kt=0.01) 
         
@@ -1,10 +1,20 @@
-from polyellipsoid import System
+from polyellipsoid import Ellipsoid, System
 from base_test import BaseTest
 
 import hoomd
+from mbuild.lib.recipes.polymer import Polymer
 import numpy as np
 import pytest
 
+
+def _b_bond_indices(compound):
+    index = {p: i for i, p in enumerate(compound.particles())}
+    return {
+            frozenset((index[a], index[b])) for a, b in compound.bonds()
+            if a.name == b.name == "B"
+    }
+
+
 class TestSystem(BaseTest):
     
     def test_n_beads(self, packed_system):
@@ -47,6 +57,41 @@ class TestSystem(BaseTest):
         assert len(sys.chains) == 10 
         assert sys.n_beads == 45
 
+    def test_chain_bonds(self):
+        sys = System(
+                n_chains=2,
+                chain_lengths=5,
+                bead_mass=1000,
+                density=0.5,
+                bead_length=2,
+                bond_length=0.2
+        )
+        for chain in sys.chains:
+            b_bonds = [
+                    bond for bond in chain.bonds()
+                    if bond[0].name == bond[1].name == "B"
+            ]
+            assert len(b_bonds) == 2*5 - 1
+            # 5 bonds within beads, 4 across neighboring beads
+            lengths = sorted(np.linalg.norm(a.pos - b.pos) for a, b in b_bonds)
+            assert np.allclose(lengths[:5], 2 / 2, atol=1e-3)
+            assert np.allclose(lengths[5:], 2 / 2 + 0.2, atol=1e-3)
+
+        # Matches the distance based bonds from freud
+        reference = Polymer()
+        reference.add_monomer(
+                Ellipsoid(mass=1000, length=2),
+                indices=[0, 1],
+                orientation=[[1,0,0], [-1,0,0]],
+                replace=False,
+                separation=0.2
+        )
+        reference.build(n=5, add_hydrogens=False)
+        reference.freud_generate_bonds(
+                name_a="B", name_b="B", dmin=2 / 2 - 0.1, dmax=2 / 2 + 0.3
+        )
+        assert _b_bond_indices(sys.chains[0]) == _b_bond_indices(reference)
+
 
     def test_pack(self):
         sys = System(
@@ -72,6 +117,82 @@ class TestSystem(BaseTest):
         sys.stack(z=1, y=1, n=2, vector=[1,1,0])
         assert isinstance(sys.target_box, np.ndarray)
 
+    def test_set_target_box(self):
+        sys = System(
+                n_chains=5,
+                chain_lengths=5,
+                bead_mass=1000,
+                density=0.5,
+                bond_length=0.25,
+                bead_length=2
+        )
+        sys.set_target_box()
+        cubic_box = sys.target_box
+        assert np.allclose(cubic_box, cubic_box[0])
+
+        sys.set_target_box(x_constraint=cubic_box[0] / 2)
+        assert sys.target_box[0] == cubic_box[0] / 2
+        assert sys.target_box[1] == sys.target_box[2]
+        assert np.isclose(np.prod(sys.target_box), np.prod(cubic_box))
+
+    def test_to_parmed(self, packed_system):
+        structure = packed_system.to_parmed()
+        coordinates = np.copy(structure.coordinates)
+        template = packed_system._parmed_topology[1]
+        # Re-packing reuses the topology but returns a new Structure
+        packed_system.pack()
+        new_structure = packed_system.to_parmed()
+        assert new_structure is not structure
+        assert packed_system._parmed_topology[1] is template
+        assert np.allclose(
+                new_structure.coordinates, packed_system.mb_system.xyz * 10
+        )
+        assert np.allclose(structure.coordinates, coordinates)
+        # Changing the bonds rebuilds the topology
+        particles = list(packed_system.mb_system.particles())
+        packed_system.mb_system.add_bond((particles[0], particles[-1]))
+        packed_system.to_parmed()
+        assert packed_system._parmed_topology[1] is not template
+
+    def test_to_parmed_no_system(self):
+        sys = System(
+                n_chains=5,
+                chain_lengths=5,
+                bead_mass=1000,
+                density=0.5,
+                bond_length=0.25,
+                bead_length=2
+        )
+        with pytest.raises(ValueError):
+            sys.to_parmed()
+
+    def test_stack_twice(self):
+        sys = System(
+                n_chains=8,
+                chain_lengths=5,
+                bead_mass=1000,
+                density=0.5,
+                bond_length=0.25,
+                bead_length=2
+        )
+        sys.stack(z=1, y=1, n=2, vector=[1,1,0])
+        xyz = sys.mb_system.xyz
+        sys.stack(z=1, y=1, n=2, vector=[1,1,0])
+        assert np.allclose(sys.mb_system.xyz, xyz)
+
+    def test_stack_layers(self):
+        sys = System(
+                n_chains=8,
+                chain_lengths=5,
+                bead_mass=1000,
+                density=0.5,
+                bond_length=0.25,
+                bead_length=2
+        )
+        sys.stack(z=1, y=1, n=2, vector=[1,0.5,0])
+        centers = np.array([chain.center for chain in sys.mb_system.children])
+        assert len(np.unique(centers.round(6), axis=0)) == len(centers)
+
     def test_stack_wrong_num_chains(self):
         sys = System(
                 n_chains=7,